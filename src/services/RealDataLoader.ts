@@ -42,8 +42,18 @@ export interface RealSessionData {
   vehicleNumbers: number[];
 }
 
+/** Written by tools/publish_artifacts.py */
+interface ArtifactManifest {
+  files: Record<string, {
+    hash: string;
+    size: number;
+    encodings: Record<string, { path: string; size: number }>;
+  }>;
+}
+
 export class RealDataLoader {
   private static instance: RealDataLoader;
+  private manifest: Promise<ArtifactManifest | null> | null = null;
   private constructor() { }
   static getInstance(): RealDataLoader {
     if (!RealDataLoader.instance) {
@@ -57,10 +67,9 @@ export class RealDataLoader {
     console.log(`Loading session data for ${track.name}, Session ${session.name}...`);
     const processedPath = `tracks/${track.id}/mapped_telemetry.csv`;
     try {
-      const head = await fetch(`/${processedPath}`, { method: 'HEAD' });
-      if (head.ok) {
-        const csvText = await (await fetch(`/${processedPath}`)).text();
-        return this.parseProcessedData(csvText, track, vehicleNumber);
+      const processed = await this.fetchArtifact(processedPath);
+      if (processed) {
+        return this.parseProcessedData(await processed.text(), track, vehicleNumber);
       }
     } catch (error) { console.debug('No processed data found', error); }
     // Fallback to raw CSVs
@@ -140,8 +149,8 @@ export class RealDataLoader {
     let mlOptimalLap: OptimalLap | null = null;
     try {
       const modelPath = `tracks/${track.id}/models/ideal_lap.csv`;
-      const resp = await fetch(`/${modelPath}`);
-      if (resp.ok) mlOptimalLap = this.parseIdealLap(await resp.text());
+      const resp = await this.fetchArtifact(modelPath);
+      if (resp) mlOptimalLap = this.parseIdealLap(await resp.text());
     } catch (error) { console.debug('No ML model found', error); }
     return {
       track: { name: track.name, length: 0, corners, sectors: 3 },
@@ -248,6 +257,29 @@ export class RealDataLoader {
     return this.processParsedData(allTelemetry, allLapTimes, weather, bestLaps, track, vehicleNumber);
   }
 
+  /** Artifact manifest, or null when the publish step has not been run */
+  private loadManifest(): Promise<ArtifactManifest | null> {
+    if (!this.manifest) {
+      this.manifest = fetch('/artifact_manifest.json')
+        .then(res => (res.ok ? res.json() : null))
+        .catch(() => null);
+    }
+    return this.manifest;
+  }
+
+  /**
+   * Fetch a generated artifact, or null if it does not exist.
+   * Files listed in the manifest are fetched by content hash so the browser can
+   * cache them indefinitely; anything else (e.g. generated after the last
+   * publish) is fetched by plain path.
+   */
+  private async fetchArtifact(path: string): Promise<Response | null> {
+    const entry = (await this.loadManifest())?.files[path];
+    const url = entry ? `/${path}?v=${entry.hash}` : `/${path}`;
+    const resp = await fetch(url);
+    return resp.ok ? resp : null;
+  }
+
   private async loadCSVFile(path: string): Promise<string> {
     console.log(`Attempting to load: /${path}`);
     const response = await fetch(`/${path}`);
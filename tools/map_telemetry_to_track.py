@@ -4,13 +4,54 @@ import numpy as np
 from scipy.spatial import KDTree
 import sys
 import os
+import sqlite3
+
+import session_store
+from session_store import normalize
 
 def load_centerline(path):
     with open(path, 'r') as f:
         data = json.load(f)
     return data['points']
 
-def map_telemetry(telemetry_path, centerline_path, output_path):
+def store_keys(telemetry_path, centerline_path):
+    # Race_Data/<track>/.../<session>/<file> -> (track, session) as used by scan_database,
+    # otherwise the public/tracks/<track>/ folder of the centerline and the file's own name
+    parts = os.path.normpath(telemetry_path).split(os.sep)
+    filename = parts[-1]
+    if "Race_Data" in parts and len(parts) - parts.index("Race_Data") > 2:
+        track_id = parts[parts.index("Race_Data") + 1]
+        session_id = normalize(parts[-2])
+    else:
+        track_id = os.path.basename(os.path.dirname(os.path.abspath(centerline_path)))
+        return track_id, normalize(os.path.splitext(filename)[0])
+    return track_id, session_store.session_key(session_id, filename)
+
+def store_mapped_telemetry(final_df, telemetry_path, track_id, session_id, store_path=session_store.STORE_FILE):
+    # Average each lap into fixed distance bins and replace this file's rows in the store
+    df = final_df.rename(columns={'Distance': 'distance', 'VehicleNumber': 'Vehicle', **session_store.SIGNAL_COLUMNS})
+    if 'Vehicle' not in df.columns:
+        df['Vehicle'] = 0
+    df['dist_bin'] = (df['distance'] // session_store.BIN_SIZE).astype(int)
+    value_cols = [c for c in session_store.SAMPLE_COLUMNS if c in df.columns]
+    binned = df.groupby(['Vehicle', 'Lap', 'dist_bin'])[value_cols].mean().reset_index()
+    binned = binned.astype(object).where(binned.notna(), None)
+
+    try:
+        conn = session_store.connect(store_path)
+        try:
+            with conn:
+                session_store.upsert_session(conn, track_id, session_id)
+            count = session_store.ingest_samples(conn, telemetry_path, track_id, session_id, binned.to_dict('records'))
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError) as e:
+        print(f"Session store not updated ({store_path}): {e}")
+        return
+    if count:
+        print(f"Stored {count} distance bins for {track_id}/{session_id} in {store_path}")
+
+def map_telemetry(telemetry_path, centerline_path, output_path, track_id=None, session_id=None):
     # Load centerline
     centerline_points = load_centerline(centerline_path)
     cl_df = pd.DataFrame(centerline_points)
@@ -31,7 +72,8 @@ def map_telemetry(telemetry_path, centerline_path, output_path):
         
         # Load only necessary columns
         cols = ['lap', 'telemetry_name', 'telemetry_value', 'timestamp', 'vehicle_number']
-        df = pd.read_csv(telemetry_path, usecols=lambda c: c in cols)
+        # Keep car numbers as text so "021" and "21" stay distinct
+        df = pd.read_csv(telemetry_path, usecols=lambda c: c in cols, dtype={'vehicle_number': str})
         
         # Filter for relevant signals
         relevant_signals = [
@@ -131,11 +173,14 @@ def map_telemetry(telemetry_path, centerline_path, output_path):
         final_df = pd.concat(mapped_data)
         final_df.to_csv(output_path, index=False)
         print(f"Mapped telemetry saved to {output_path}")
+
+        default_track, default_session = store_keys(telemetry_path, centerline_path)
+        store_mapped_telemetry(final_df, telemetry_path, track_id or default_track, session_id or default_session)
     else:
         print("Could not map telemetry (no valid laps)")
 
 if __name__ == "__main__":
     if len(sys.argv) < 4:
-        print("Usage: python map_telemetry_to_track.py <telemetry_csv> <centerline_json> <output_csv>")
+        print("Usage: python map_telemetry_to_track.py <telemetry_csv> <centerline_json> <output_csv> [track_id] [session_id]")
     else:
-        map_telemetry(sys.argv[1], sys.argv[2], sys.argv[3])
+        map_telemetry(sys.argv[1], sys.argv[2], sys.argv[3], *sys.argv[4:6])
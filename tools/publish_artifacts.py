@@ -0,0 +1,132 @@
+"""Publish generated artifacts
+
+Writes gzip and brotli variants next to every generated file under `public/`
+and a single `artifact_manifest.json` listing content hashes, sizes and the
+available encodings. Clients read the manifest once, request files as
+`<path>?v=<hash>` (safe to cache forever) and never have to probe with HEAD.
+
+Usage: python tools/publish_artifacts.py [public_dir]
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PUBLIC_DIR = "public"
+MANIFEST_FILE = "artifact_manifest.json"
+
+# Files produced by scan_database, process_track, map_telemetry_to_track and train_models
+ARTIFACT_PATTERNS = [
+    "database.json",
+    "tracks/*/centerline.json",
+    "tracks/*/track.obj",
+    "tracks/*/mapped_telemetry.csv",
+    "tracks/*/models/ideal_lap.csv",
+]
+
+ENCODINGS = {
+    "gzip": ".gz",
+    "br": ".br",
+}
+
+
+def compress(data, encoding):
+    if encoding == "gzip":
+        # mtime=0 keeps the output byte-identical between runs
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    raise ValueError(f"Unknown encoding {encoding}")
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def find_artifacts(public_dir):
+    paths = []
+    for pattern in ARTIFACT_PATTERNS:
+        paths.extend(glob.glob(os.path.join(public_dir, pattern)))
+    return sorted(os.path.relpath(p, public_dir).replace("\\", "/") for p in paths)
+
+
+def load_manifest(public_dir):
+    path = os.path.join(public_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"files": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def remove_stale_variants(public_dir, manifest):
+    """Delete .gz/.br files this run did not write: encodings that are no longer
+    produced (e.g. brotli uninstalled) and variants of removed artifacts."""
+    for pattern in ARTIFACT_PATTERNS:
+        for encoding, suffix in ENCODINGS.items():
+            for variant_path in glob.glob(os.path.join(public_dir, pattern + suffix)):
+                rel_path = os.path.relpath(variant_path[:-len(suffix)], public_dir).replace("\\", "/")
+                if encoding not in manifest["files"].get(rel_path, {}).get("encodings", {}):
+                    os.remove(variant_path)
+                    print(f"Removed stale {os.path.relpath(variant_path, public_dir)}")
+
+
+def publish(public_dir=PUBLIC_DIR):
+    encodings = [e for e in ENCODINGS if e != "br" or brotli is not None]
+    if brotli is None:
+        print("brotli not installed, writing gzip variants only (pip install brotli)")
+
+    previous = load_manifest(public_dir)["files"]
+    manifest = {"files": {}}
+
+    for rel_path in find_artifacts(public_dir):
+        path = os.path.join(public_dir, rel_path)
+        with open(path, "rb") as f:
+            data = f.read()
+
+        digest = content_hash(data)
+        entry = {"hash": digest, "size": len(data), "encodings": {}}
+        old = previous.get(rel_path, {})
+
+        for encoding in encodings:
+            variant_path = path + ENCODINGS[encoding]
+            old_variant = old.get("encodings", {}).get(encoding)
+            # Unchanged source and variant still on disk -> reuse it
+            if old.get("hash") == digest and old_variant and os.path.exists(variant_path):
+                # Source may have been rewritten with identical bytes; keep the variant
+                # at least as new so serve_static does not treat it as stale
+                if os.path.getmtime(variant_path) < os.path.getmtime(path):
+                    os.utime(variant_path)
+                entry["encodings"][encoding] = old_variant
+                continue
+
+            compressed = compress(data, encoding)
+            with open(variant_path, "wb") as f:
+                f.write(compressed)
+            entry["encodings"][encoding] = {
+                "path": rel_path + ENCODINGS[encoding],
+                "size": len(compressed),
+            }
+
+        manifest["files"][rel_path] = entry
+        sizes = ", ".join(f"{e} {v['size']}" for e, v in entry["encodings"].items())
+        print(f"{rel_path}: {len(data)} bytes ({sizes})")
+
+    remove_stale_variants(public_dir, manifest)
+
+    with open(os.path.join(public_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"Manifest with {len(manifest['files'])} artifacts written to {os.path.join(public_dir, MANIFEST_FILE)}")
+    return manifest
+
+
+if __name__ == "__main__":
+    publish(sys.argv[1] if len(sys.argv) > 1 else PUBLIC_DIR)
@@ -1,6 +1,9 @@
 import os
 import json
-import re
+import sqlite3
+
+import session_store
+from session_store import normalize
 
 RACE_DATA_DIR = "Race_Data"
 OUTPUT_FILE = "public/database.json"
@@ -12,9 +15,6 @@ NAME_MAPPINGS = {
     "indianapolis": ["indy"],
 }
 
-def normalize(text):
-    return re.sub(r'[^a-z0-9]', '', text.lower())
-
 def find_map_file(track_dir_name, map_files):
     normalized_track = normalize(track_dir_name)
     keywords = track_dir_name.split('-')
@@ -50,6 +50,8 @@ def find_map_file(track_dir_name, map_files):
 
 def scan_database():
     database = {"tracks": []}
+    # (track id, session id, session name, session path, file path) of lap/sector files
+    lap_sources = []
     
     if not os.path.exists(RACE_DATA_DIR):
         print(f"Error: {RACE_DATA_DIR} not found.")
@@ -100,6 +102,11 @@ def scan_database():
                     sessions_map[session_name] = {"path": rel_path.replace("\\", "/"), "files": []}
                 
                 sessions_map[session_name]["files"].extend(valid_files)
+                lap_sources.extend(
+                    (track_dir, normalize(session_name), session_name.replace("_", " ").title(),
+                     sessions_map[session_name]["path"], os.path.join(root, f))
+                    for f in valid_files if f.startswith("23_AnalysisEnduranceWithSections")
+                )
         
         for session_name, files in sessions_map.items():
             track_info["sessions"].append({
@@ -117,5 +124,34 @@ def scan_database():
     
     print(f"Database index written to {OUTPUT_FILE}")
 
+    update_session_store(lap_sources)
+
+def update_session_store(lap_sources, store_path=session_store.STORE_FILE):
+    # Incrementally load lap/sector times into the indexed session store;
+    # unchanged source files are skipped. Store problems are reported but never
+    # affect database.json, which has already been written.
+    try:
+        conn = session_store.connect(store_path)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Session store not updated ({store_path}): {e}")
+        return
+
+    try:
+        for track_id, session_id, session_name, session_path, file_path in lap_sources:
+            key = session_store.session_key(session_id, os.path.basename(file_path))
+            try:
+                with conn:
+                    session_store.upsert_session(conn, track_id, key, session_name, session_path)
+                count = session_store.ingest_lap_sections(conn, file_path, track_id, key)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Session store: skipped {file_path}: {e}")
+                continue
+            if count:
+                print(f"Stored {count} laps for {track_id}/{key}")
+    finally:
+        conn.close()
+
+    print(f"Session store updated at {store_path}")
+
 if __name__ == "__main__":
     scan_database()
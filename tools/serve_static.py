@@ -0,0 +1,189 @@
+"""Local static server for published artifacts
+
+Serves a directory (default `public/`) the way a CDN would serve the output
+of `publish_artifacts.py`:
+
+- picks the `.br` / `.gz` variant that matches Accept-Encoding, as long as it
+  is not older than the source file
+- answers single `Range: bytes=...` requests with 206 / 416
+- sends an ETag and honours If-None-Match
+- marks `?v=<hash>` requests as immutable when the hash matches the file's
+  current content, `no-cache` otherwise
+
+Usage: python tools/serve_static.py [root_dir] [port]
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+import sys
+from email.utils import formatdate
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from publish_artifacts import content_hash
+
+ROOT_DIR = "public"
+PORT = 8080
+
+# Preferred first
+VARIANTS = [("br", ".br"), ("gzip", ".gz")]
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# (path, mtime_ns, size) -> content hash, so large files are hashed once per change
+_hash_cache = {}
+
+
+def current_hash(path):
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _hash_cache:
+        with open(path, "rb") as f:
+            _hash_cache[key] = content_hash(f.read())
+    return _hash_cache[key]
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def parse_range(header, size):
+    """Return (start, end) inclusive for a single byte range, None to ignore the
+    header, or "unsatisfiable"."""
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", (header or "").strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    if size == 0:
+        return "unsatisfiable"
+    first, last = match.groups()
+    if first == "":
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+
+class StaticHandler(SimpleHTTPRequestHandler):
+
+    def do_GET(self):
+        self.send_file(head_only=False)
+
+    def do_HEAD(self):
+        self.send_file(head_only=True)
+
+    def resolve(self, url_path):
+        path = posixpath.normpath(unquote(url_path)).lstrip("/")
+        if path.startswith(".."):
+            return None
+        full = os.path.join(self.directory, *path.split("/"))
+        if os.path.isdir(full):
+            full = os.path.join(full, "index.html")
+        return full if os.path.isfile(full) else None
+
+    def send_file(self, head_only):
+        url = urlsplit(self.path)
+        path = self.resolve(url.path)
+        if path is None:
+            self.send_error(404, "File not found")
+            return
+
+        content_type = self.guess_type(path)
+        version = parse_qs(url.query).get("v", [None])[0]
+        immutable = version is not None and version == current_hash(path)
+        encoding = None
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding"))
+        source_mtime = os.stat(path).st_mtime_ns
+        for name, suffix in VARIANTS:
+            variant = path + suffix
+            # A variant older than its source is stale (source rewritten since publish)
+            if name in accepted and os.path.isfile(variant) and os.stat(variant).st_mtime_ns >= source_mtime:
+                path, encoding = variant, name
+                break
+
+        stat = os.stat(path)
+        size = stat.st_size
+        etag = '"%s"' % hashlib.sha1(f"{path}:{stat.st_mtime_ns}:{size}".encode()).hexdigest()[:16]
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_common_headers(etag, encoding, immutable)
+            self.end_headers()
+            return
+
+        byte_range = None
+        if_range = self.headers.get("If-Range")
+        if self.headers.get("Range") and (if_range is None or if_range == etag):
+            byte_range = parse_range(self.headers["Range"], size)
+
+        if byte_range == "unsatisfiable":
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        start, end = byte_range or (0, size - 1)
+        length = max(end - start + 1, 0)
+        self.send_response(206 if byte_range else 200)
+        self.send_common_headers(etag, encoding, immutable)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Last-Modified", formatdate(stat.st_mtime, usegmt=True))
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+
+        if head_only or length == 0:
+            return
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(64 * 1024, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+    def send_common_headers(self, etag, encoding, immutable):
+        self.send_header("ETag", etag)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Cache-Control", IMMUTABLE if immutable else "no-cache")
+
+
+def serve(root_dir=ROOT_DIR, port=PORT):
+    def handler(*args, **kwargs):
+        return StaticHandler(*args, directory=root_dir, **kwargs)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    print(f"Serving {os.path.abspath(root_dir)} at http://127.0.0.1:{port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve(
+        sys.argv[1] if len(sys.argv) > 1 else ROOT_DIR,
+        int(sys.argv[2]) if len(sys.argv) > 2 else PORT,
+    )
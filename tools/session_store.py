@@ -0,0 +1,340 @@
+"""Indexed local session store
+
+Embedded SQLite store that `scan_database.py` and `map_telemetry_to_track.py`
+fill incrementally. Lap and sector times come from the
+`23_AnalysisEnduranceWithSections` files, distance-binned telemetry from the
+mapped telemetry. Everything is keyed on (track, session, vehicle, lap[, bin])
+so cross-track and cross-session questions are answered from the index instead
+of re-parsing the source CSVs, e.g.
+
+    from session_store import connect, fastest_sector
+    with connect() as conn:
+        fastest_sector(conn, "barber-motorsports-park", 2, vehicle="13")
+
+Car numbers are kept as the raw strings from the source files ("021" and
+"21" are different entries).
+
+Only the standard library is used here so the scanner keeps working without
+the ML dependencies installed.
+"""
+
+import csv
+import os
+import re
+import sqlite3
+
+STORE_FILE = "data/session_store.db"
+
+# Bump when the schema changes; the store is rebuilt from the sources
+SCHEMA_VERSION = 2
+
+# Width of a distance bin in metres
+BIN_SIZE = 10.0
+
+# Mapped telemetry signal -> store column
+SIGNAL_COLUMNS = {
+    "speed": "speed",
+    "aps": "aps",
+    "pbrake_f": "pbrake_f",
+    "pbrake_r": "pbrake_r",
+    "Steering_Angle": "steering_angle",
+    "gear": "gear",
+    "nmot": "nmot",
+    "accx_can": "accx",
+    "accy_can": "accy",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    track TEXT NOT NULL,
+    session TEXT NOT NULL,
+    name TEXT,
+    path TEXT,
+    PRIMARY KEY (track, session)
+);
+CREATE TABLE IF NOT EXISTS laps (
+    track TEXT NOT NULL,
+    session TEXT NOT NULL,
+    vehicle TEXT NOT NULL,
+    driver TEXT NOT NULL,
+    entry INTEGER NOT NULL,
+    lap INTEGER NOT NULL,
+    lap_time REAL,
+    s1 REAL,
+    s2 REAL,
+    s3 REAL,
+    top_speed REAL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (track, session, vehicle, driver, entry, lap)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS samples (
+    track TEXT NOT NULL,
+    session TEXT NOT NULL,
+    vehicle TEXT NOT NULL,
+    lap INTEGER NOT NULL,
+    dist_bin INTEGER NOT NULL,
+    distance REAL,
+    x REAL,
+    z REAL,
+    speed REAL,
+    aps REAL,
+    pbrake_f REAL,
+    pbrake_r REAL,
+    steering_angle REAL,
+    gear REAL,
+    nmot REAL,
+    accx REAL,
+    accy REAL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (track, session, vehicle, lap, dist_bin)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS laps_by_vehicle ON laps (vehicle, track);
+CREATE INDEX IF NOT EXISTS laps_by_source ON laps (source);
+CREATE INDEX IF NOT EXISTS samples_by_bin ON samples (track, dist_bin);
+CREATE INDEX IF NOT EXISTS samples_by_source ON samples (source);
+"""
+
+SAMPLE_COLUMNS = ["distance", "x", "z"] + list(SIGNAL_COLUMNS.values())
+
+
+def connect(path=STORE_FILE):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript(
+            "DROP TABLE IF EXISTS sources; DROP TABLE IF EXISTS sessions; "
+            "DROP TABLE IF EXISTS laps; DROP TABLE IF EXISTS samples;"
+        )
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def normalize(text):
+    """Session/track id form shared by scan_database and map_telemetry_to_track."""
+    return re.sub(r'[^a-z0-9]', '', text.lower())
+
+
+def race_tag(filename):
+    """Return "r1", "r2", ... for files named like "R1_...", "..._R1.csv" or
+    "..._Race 1...", else None."""
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    match = (re.match(r'r(\d+)_', stem, re.I)
+             or re.search(r'[_\s-]r(\d+)$', stem, re.I)
+             or re.search(r'race\s*_?(\d+)', stem, re.I))
+    return f"r{int(match.group(1))}" if match else None
+
+
+def session_key(session_id, filename):
+    """Store session id for a source file.
+
+    Some track folders hold both races in a single session directory, so the
+    race number from the file name is appended unless the session id already
+    carries it (e.g. "race1").
+    """
+    tag = race_tag(filename)
+    carried = re.search(r'(?:race|r)(\d+)$', session_id)
+    if tag is None or (carried and int(carried.group(1)) == int(tag[1:])):
+        return session_id
+    return f"{session_id}-{tag}"
+
+
+def is_current(conn, path):
+    """True if `path` was ingested before and has not changed since."""
+    stat = os.stat(path)
+    row = conn.execute("SELECT mtime, size FROM sources WHERE path = ?", (path,)).fetchone()
+    return row is not None and row["mtime"] == stat.st_mtime and row["size"] == stat.st_size
+
+
+def _mark_current(conn, path):
+    stat = os.stat(path)
+    conn.execute(
+        "INSERT OR REPLACE INTO sources (path, mtime, size) VALUES (?, ?, ?)",
+        (path, stat.st_mtime, stat.st_size),
+    )
+
+
+def upsert_session(conn, track, session, name=None, path=None):
+    # Keep a known name/path when the caller (e.g. telemetry mapping) has none
+    conn.execute(
+        "INSERT INTO sessions (track, session, name, path) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (track, session) DO UPDATE SET "
+        "name = COALESCE(excluded.name, name), path = COALESCE(excluded.path, path)",
+        (track, session, name, path),
+    )
+
+
+def parse_time(text):
+    """Convert "1:54.168" / "33.413" style times to seconds."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    seconds = 0.0
+    try:
+        for part in text.split(":"):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        return None
+    return seconds
+
+
+def _parse_int(text):
+    try:
+        return int(float(text))
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_float(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def ingest_lap_sections(conn, csv_path, track, session):
+    """Load lap and sector times from a 23_AnalysisEnduranceWithSections file.
+
+    Some files list two cars under the same NUMBER/DRIVER_NUMBER; each block
+    gets its own `entry` (0, 1, ...) from the order in which a lap repeats.
+    Returns the number of laps stored, or 0 if the file was already current.
+    """
+    if is_current(conn, csv_path):
+        return 0
+
+    rows = []
+    seen = {}
+    with open(csv_path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        reader = csv.DictReader(f, delimiter=';')
+        for raw in reader:
+            row = {(k or "").strip(): (v or "").strip() for k, v in raw.items()}
+            vehicle = row.get("NUMBER", "")
+            driver = row.get("DRIVER_NUMBER", "")
+            lap = _parse_int(row.get("LAP_NUMBER"))
+            if not vehicle or lap is None:
+                continue
+            entry = seen.get((vehicle, driver, lap), 0)
+            seen[(vehicle, driver, lap)] = entry + 1
+            rows.append((
+                track, session, vehicle, driver, entry, lap,
+                parse_time(row.get("LAP_TIME")),
+                _parse_float(row.get("S1_SECONDS")),
+                _parse_float(row.get("S2_SECONDS")),
+                _parse_float(row.get("S3_SECONDS")),
+                _parse_float(row.get("TOP_SPEED")),
+                csv_path,
+            ))
+
+    try:
+        with conn:
+            conn.execute("DELETE FROM laps WHERE source = ?", (csv_path,))
+            conn.executemany(
+                "INSERT INTO laps "
+                "(track, session, vehicle, driver, entry, lap, lap_time, s1, s2, s3, top_speed, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            _mark_current(conn, csv_path)
+            stored = conn.execute("SELECT COUNT(*) FROM laps WHERE source = ?", (csv_path,)).fetchone()[0]
+    except sqlite3.IntegrityError:
+        _report_conflict(conn, "laps", csv_path, track, session)
+        return 0
+    return stored
+
+
+def ingest_samples(conn, source, track, session, rows):
+    """Replace the distance-binned telemetry that came from `source`.
+
+    `rows` is an iterable of dicts with Vehicle, Lap, dist_bin and any of
+    SAMPLE_COLUMNS; missing values are stored as NULL.
+    """
+    columns = ["track", "session", "vehicle", "lap", "dist_bin"] + SAMPLE_COLUMNS + ["source"]
+    records = [
+        (track, session, str(r["Vehicle"]), int(r["Lap"]), int(r["dist_bin"]))
+        + tuple(r.get(c) for c in SAMPLE_COLUMNS)
+        + (source,)
+        for r in rows
+    ]
+    try:
+        with conn:
+            conn.execute("DELETE FROM samples WHERE source = ?", (source,))
+            conn.executemany(
+                f"INSERT INTO samples ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                records,
+            )
+            stored = conn.execute("SELECT COUNT(*) FROM samples WHERE source = ?", (source,)).fetchone()[0]
+    except sqlite3.IntegrityError:
+        _report_conflict(conn, "samples", source, track, session)
+        return 0
+    return stored
+
+
+def _report_conflict(conn, table, source, track, session):
+    # The transaction was rolled back, so the store still holds the other file's rows
+    others = [r[0] for r in conn.execute(
+        f"SELECT DISTINCT source FROM {table} WHERE track = ? AND session = ? AND source != ?",
+        (track, session, source))]
+    print(f"Skipped {source}: its {table} overlap rows already stored for {track}/{session} "
+          f"from {', '.join(others) or 'the same file'}. Pass a distinct session id for it.")
+
+
+# --- Queries ---
+
+def _where(filters):
+    clauses = [f"{column} = ?" for column, value in filters if value is not None]
+    params = [value for _, value in filters if value is not None]
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+def list_sessions(conn, track=None):
+    where, params = _where([("track", track)])
+    return [dict(r) for r in conn.execute(
+        f"SELECT track, session, name, path FROM sessions{where} ORDER BY track, session", params)]
+
+
+def query_laps(conn, track=None, session=None, vehicle=None):
+    where, params = _where([("track", track), ("session", session), ("vehicle", vehicle)])
+    return [dict(r) for r in conn.execute(
+        f"SELECT track, session, vehicle, driver, entry, lap, lap_time, s1, s2, s3, top_speed "
+        f"FROM laps{where} ORDER BY track, session, vehicle, driver, entry, lap", params)]
+
+
+def fastest_laps(conn, track=None, session=None, vehicle=None, limit=10):
+    where, params = _where([("track", track), ("session", session), ("vehicle", vehicle)])
+    where += (" AND " if where else " WHERE ") + "lap_time > 0"
+    return [dict(r) for r in conn.execute(
+        f"SELECT track, session, vehicle, driver, entry, lap, lap_time FROM laps{where} "
+        f"ORDER BY lap_time LIMIT ?", params + [limit])]
+
+
+def fastest_sector(conn, track, sector, vehicle=None, session=None):
+    """Fastest time in `sector` (1-3) over all matching sessions, or None."""
+    if sector not in (1, 2, 3):
+        raise ValueError(f"Unknown sector {sector}")
+    column = f"s{sector}"
+    where, params = _where([("track", track), ("session", session), ("vehicle", vehicle)])
+    where += (" AND " if where else " WHERE ") + f"{column} > 0"
+    row = conn.execute(
+        f"SELECT track, session, vehicle, driver, entry, lap, {column} AS time FROM laps{where} "
+        f"ORDER BY {column} LIMIT 1", params).fetchone()
+    return dict(row) if row else None
+
+
+def speed_profile(conn, track, vehicle=None, session=None, signal="speed"):
+    """Per distance bin average, minimum and maximum of `signal` across laps."""
+    if signal not in SAMPLE_COLUMNS:
+        raise ValueError(f"Unknown signal {signal}")
+    where, params = _where([("track", track), ("session", session), ("vehicle", vehicle)])
+    return [dict(r) for r in conn.execute(
+        f"SELECT dist_bin, AVG(distance) AS distance, AVG({signal}) AS mean, "
+        f"MIN({signal}) AS min, MAX({signal}) AS max, COUNT({signal}) AS samples "
+        f"FROM samples{where} GROUP BY dist_bin ORDER BY dist_bin", params)]